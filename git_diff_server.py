@@ -3,11 +3,20 @@
 Git Diff MCP Server - Get git diffs between branches for PR review assistance
 """
 
+import io
 import os
+import re
+import json
 import sys
+import asyncio
+import time
+import signal
 import logging
-import subprocess
+import functools
+from collections import namedtuple
+from contextlib import aclosing
 from datetime import datetime, timezone
+from typing import Literal
 
 from mcp.server.fastmcp import FastMCP
 
@@ -24,95 +33,245 @@ mcp = FastMCP("git-diff")
 
 # Configuration
 REPO_PATH = "/repo"
+STREAM_LINE_LIMIT = 16 * 1024 * 1024  # Longest single diff line we will buffer
+
+# Plain C locale, no optional index locks and no interactive prompts for every git call
+GIT_ENV = {
+    **os.environ,
+    'LC_ALL': 'C',
+    'LANG': 'C',
+    'GIT_OPTIONAL_LOCKS': '0',
+    'GIT_TERMINAL_PROMPT': '0'
+}
+
+# Diff line prefixes matched in the iter_format_diff hot loop
+_HDR = b'diff --git'
+_HUNK = b'@@'
+_BODY = (b'+', b'-', b' ')
+_DIFF_HDR_RE = re.compile(rb'diff --git a/.* b/(.*)')  # Greedy so paths may contain spaces
+
+_FETCH_TTL = 60.0  # Seconds to reuse a successful `git fetch --all`
+_LAST_FETCH_MONO = float('-inf')  # time.monotonic() may start near 0 after boot
 
 # === UTILITY FUNCTIONS ===
 
-def run_git_command(command):
-    """Run a git command in the repository directory."""
+@functools.lru_cache(maxsize=1)
+def _repo_ok():
+    """Check once whether REPO_PATH is a git repository; send SIGHUP to re-check."""
+    return os.path.exists(os.path.join(REPO_PATH, '.git'))
+
+class GitCommandError(Exception):
+    """Raised when a streamed git command exits with a non-zero status."""
+
+GitResult = namedtuple("GitResult", ["returncode", "stdout", "stderr"])
+Chunk = namedtuple("Chunk", ["file", "content", "lines"])
+
+def _git(*args):
+    """Build a git command line that never spawns a pager."""
+    return ["git", "--no-pager", *args]
+
+async def run_git_command(command, env=None):
+    """Run a git command in the repository directory without blocking the event loop."""
     try:
-        result = subprocess.run(
-            command,
+        proc = await asyncio.create_subprocess_exec(
+            *command,
             cwd=REPO_PATH,
-            capture_output=True,
-            text=True,
-            timeout=30
+            env=GIT_ENV if env is None else env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=30)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logger.error("Git command timed out")
+            return None
+        return GitResult(
+            proc.returncode,
+            stdout.decode('utf-8', 'replace'),
+            stderr.decode('utf-8', 'replace')
         )
-        return result
-    except subprocess.TimeoutExpired:
-        logger.error("Git command timed out")
-        return None
     except Exception as e:
         logger.error(f"Error running git command: {e}")
         return None
 
-def format_diff_output(diff_text, max_chunk_size=2000):
-    """Format diff output for better LLM consumption."""
-    if not diff_text.strip():
-        return "No differences found between the specified branches."
-    
-    lines = diff_text.split('\n')
-    formatted_output = []
-    current_file = None
-    current_chunk = []
+async def run_git_command_stream(command, env=None):
+    """Run a git command and yield its raw stdout lines (as bytes) as they are produced."""
+    proc = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=REPO_PATH,
+        env=GIT_ENV if env is None else env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LINE_LIMIT
+    )
+    # Drain stderr concurrently so a chatty git cannot stall on a full pipe
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    try:
+        async for raw_line in proc.stdout:
+            if raw_line.endswith(b'\n'):
+                raw_line = raw_line[:-1]
+            yield raw_line
+        stderr = await stderr_task
+        await proc.wait()
+        if proc.returncode != 0:
+            raise GitCommandError(stderr.decode('utf-8', 'replace').strip())
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if not stderr_task.done():
+            stderr_task.cancel()
+
+def _diff_file_path(header_line):
+    """Extract the target file path from a `diff --git` header line."""
+    match = _DIFF_HDR_RE.match(header_line)
+    if match:
+        return match.group(1).decode('utf-8', 'replace')
+    return "unknown"
+
+def parse_numstat(numstat_text):
+    """Parse `git diff --numstat -z` output into (changed_lines, paths) tuples.
+    
+    Renamed files carry both their old and new path so a pathspec keeps the rename intact.
+    """
+    entries = []
+    tokens = numstat_text.split('\0')
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if not token:
+            continue
+        added, deleted, path = token.split('\t', 2)
+        if path:
+            paths = (path,)
+        else:
+            # Renames/copies are followed by separate old and new path tokens
+            paths = tuple(tokens[i:i + 2])
+            i += 2
+        # Binary files report '-' for both counts
+        changed = (int(added) if added.isdigit() else 0) + (int(deleted) if deleted.isdigit() else 0)
+        entries.append((changed, paths))
+    return entries
+
+async def select_diff_paths(base_branch, target_branch, max_files):
+    """Return (paths, total_files) for the changes between two branches.
+    
+    paths holds the max_files most changed paths (old and new for renames), or None when
+    every changed file fits; total_files is the number of changed files, 0 meaning none.
+    """
+    # Counting names does not diff file contents, so most PRs never need --numstat
+    names_result = await run_git_command(_git(
+        "diff", 
+        f"{base_branch}...{target_branch}",
+        "--name-only", "-z"
+    ))
+    
+    if not names_result:
+        raise GitCommandError("Failed to execute git diff --name-only command")
+    
+    if names_result.returncode != 0:
+        raise GitCommandError(names_result.stderr.strip())
+    
+    file_count = sum(1 for name in names_result.stdout.split('\0') if name)
+    if file_count <= max_files:
+        return None, file_count
+    
+    numstat_result = await run_git_command(_git(
+        "diff", 
+        f"{base_branch}...{target_branch}",
+        "--numstat", "-z"
+    ))
+    
+    if not numstat_result:
+        raise GitCommandError("Failed to execute git diff --numstat command")
+    
+    if numstat_result.returncode != 0:
+        raise GitCommandError(numstat_result.stderr.strip())
+    
+    entries = parse_numstat(numstat_result.stdout)
+    entries.sort(key=lambda entry: entry[0], reverse=True)
+    paths = [path for _, entry_paths in entries[:max_files] for path in entry_paths]
+    return paths, len(entries)
+
+async def iter_format_diff(line_iter, max_chunk_size=2000, stats=None, max_lines_per_file=None):
+    """Format streamed diff lines for better LLM consumption, yielding one chunk at a time.
+    
+    Lines are handled as bytes and each chunk is decoded exactly once when it is emitted.
+    Anything before the first `diff --git` header (e.g. `--patch-with-stat` output) is
+    appended to the optional stats list instead of being chunked. Changed lines past
+    max_lines_per_file in a single file are dropped and replaced by a truncation note.
+    """
+    line_limit = max_lines_per_file or float('inf')
+    
+    # Collect the preamble up to the first file header
+    async for line in line_iter:
+        if line.startswith(_HDR):
+            break
+        if stats is not None:
+            stats.append(line.decode('utf-8', 'replace'))
+    else:
+        return
+    
+    current_file = _diff_file_path(line)
+    current_chunk = [line]
+    current_chunk_size = len(line) + 1  # Running length of b'\n'.join(current_chunk), plus one
     chunk_line_count = 0
+    file_change_count = 0
+    in_hunk = False  # '---'/'+++' are file headers until the file's first '@@'
     
-    for line in lines:
-        if line.startswith('diff --git'):
-            # New file detected
-            if current_file and current_chunk:
-                # Save previous file's chunk
-                formatted_output.append({
-                    'file': current_file,
-                    'content': '\n'.join(current_chunk),
-                    'lines': chunk_line_count
-                })
+    async for line in line_iter:
+        # Body lines dominate real diffs, so test for them first
+        if in_hunk and line.startswith(_BODY):
+            # Only '+'/'-' lines count towards the limit; context is dropped once it is hit
+            if not line.startswith(b' '):
+                file_change_count += 1
+            if file_change_count > line_limit:
+                continue
             
-            # Extract file path
-            parts = line.split(' ')
-            if len(parts) >= 4:
-                current_file = parts[3][2:]  # Remove 'b/' prefix
-            else:
-                current_file = "unknown"
-            
-            current_chunk = [line]
-            chunk_line_count = 0
-            
-        elif line.startswith('+++') or line.startswith('---'):
-            current_chunk.append(line)
-        elif line.startswith('@@'):
-            current_chunk.append(line)
-        elif line.startswith('+') or line.startswith('-') or line.startswith(' '):
             current_chunk.append(line)
+            current_chunk_size += len(line) + 1
             chunk_line_count += 1
             
             # If chunk is getting too large, split it
-            if len('\n'.join(current_chunk)) > max_chunk_size:
-                formatted_output.append({
-                    'file': current_file,
-                    'content': '\n'.join(current_chunk),
-                    'lines': chunk_line_count
-                })
-                current_chunk = [f"... (continuing {current_file})"]
+            if current_chunk_size > max_chunk_size:
+                yield Chunk(current_file, b'\n'.join(current_chunk).decode('utf-8', 'replace'), chunk_line_count)
+                continuation_header = f"... (continuing {current_file})".encode('utf-8')
+                current_chunk = [continuation_header]
+                current_chunk_size = len(continuation_header) + 1
                 chunk_line_count = 0
+        elif line.startswith(_HDR):
+            # New file detected, emit previous file's chunk
+            if file_change_count > line_limit:
+                current_chunk.append(f"... ({file_change_count - line_limit} more changed lines truncated)".encode('utf-8'))
+            yield Chunk(current_file, b'\n'.join(current_chunk).decode('utf-8', 'replace'), chunk_line_count)
+            
+            current_file = _diff_file_path(line)
+            current_chunk = [line]
+            current_chunk_size = len(line) + 1
+            chunk_line_count = 0
+            file_change_count = 0
+            in_hunk = False
         else:
+            # Hunk headers ('@@'), file and extended header lines pass through as-is
+            if line.startswith(_HUNK):
+                in_hunk = True
+            if file_change_count > line_limit:
+                continue
             current_chunk.append(line)
+            current_chunk_size += len(line) + 1
     
     # Don't forget the last chunk
-    if current_file and current_chunk:
-        formatted_output.append({
-            'file': current_file,
-            'content': '\n'.join(current_chunk),
-            'lines': chunk_line_count
-        })
-    
-    return formatted_output
+    if file_change_count > line_limit:
+        current_chunk.append(f"... ({file_change_count - line_limit} more changed lines truncated)".encode('utf-8'))
+    yield Chunk(current_file, b'\n'.join(current_chunk).decode('utf-8', 'replace'), chunk_line_count)
 
-# === MCP TOOLS ===
-
-@mcp.tool()
-async def get_branch_diff(base_branch: str = "main", target_branch: str = "HEAD") -> str:
-    """Get git diff between two branches formatted for PR review."""
-    logger.info(f"Getting diff between {base_branch} and {target_branch}")
+async def build_branch_diff(base_branch, target_branch, fetch=True, with_stats=False, output_format="markdown",
+                            max_files=None, max_lines_per_file=None):
+    """Fetch, stream and render the diff between two branches as Markdown or JSON."""
+    global _LAST_FETCH_MONO
     
     if not base_branch.strip():
         return "❌ Error: Base branch is required"
@@ -120,57 +279,141 @@ async def get_branch_diff(base_branch: str = "main", target_branch: str = "HEAD"
     if not target_branch.strip():
         target_branch = "HEAD"
     
+    if (max_files or 0) < 0 or (max_lines_per_file or 0) < 0:
+        return "❌ Error: max_files and max_lines_per_file must be 0 (no limit) or greater"
+    
     # Check if repository exists
-    if not os.path.exists(REPO_PATH):
+    if not _repo_ok():
         return f"❌ Error: Repository not found at {REPO_PATH}. Make sure to mount your git repository."
     
     try:
-        # Fetch latest changes
-        fetch_result = run_git_command(["git", "fetch", "--all"])
-        if fetch_result and fetch_result.returncode != 0:
-            logger.warning(f"Git fetch failed: {fetch_result.stderr}")
-        
-        # Get the diff
-        diff_result = run_git_command([
-            "git", "diff", 
-            f"{base_branch}...{target_branch}",
-            "--no-color"
-        ])
-        
-        if not diff_result:
-            return "❌ Error: Failed to execute git diff command"
-        
-        if diff_result.returncode != 0:
-            return f"❌ Git Error: {diff_result.stderr.strip()}"
-        
-        diff_text = diff_result.stdout
-        
-        if not diff_text.strip():
+        # Fetch latest changes, reusing a recent successful fetch
+        now = time.monotonic()
+        if fetch and now - _LAST_FETCH_MONO > _FETCH_TTL:
+            fetch_result = await run_git_command(_git("fetch", "--all"))
+            if fetch_result and fetch_result.returncode == 0:
+                _LAST_FETCH_MONO = now
+            elif fetch_result:
+                logger.warning(f"Git fetch failed: {fetch_result.stderr}")
+        
+        selected_paths, total_files = None, 0
+        if max_files:
+            # For large PRs, let git produce patches only for the most changed files;
+            # the changed-file count also tells us when there is nothing to diff
+            selected_paths, total_files = await select_diff_paths(base_branch, target_branch, max_files)
+            has_changes = total_files > 0
+        else:
+            # Cheap exit-code-only comparison before generating any patch text
+            quiet_result = await run_git_command(_git(
+                "diff", "--quiet",
+                f"{base_branch}...{target_branch}"
+            ))
+            
+            if not quiet_result:
+                return "❌ Error: Failed to execute git diff command"
+            
+            if quiet_result.returncode not in (0, 1):
+                return f"❌ Git Error: {quiet_result.stderr.strip()}"
+            
+            has_changes = quiet_result.returncode == 1
+        
+        if not has_changes:
+            if output_format == "json":
+                payload = {'base': base_branch, 'target': target_branch, 'files': []}
+                if with_stats:
+                    payload['stats'] = ''
+                return json.dumps(payload, ensure_ascii=False)
             return f"✅ No differences found between {base_branch} and {target_branch}"
         
-        # Format the diff for better consumption
-        formatted_chunks = format_diff_output(diff_text)
-        
-        if isinstance(formatted_chunks, str):
-            return formatted_chunks
-        
-        # Build the output
-        output = [f"📊 Git Diff: {base_branch}...{target_branch}"]
-        output.append(f"Found {len(formatted_chunks)} file(s) with changes:\n")
-        
-        for i, chunk in enumerate(formatted_chunks, 1):
-            output.append(f"📁 File {i}: {chunk['file']}")
-            output.append(f"Lines changed: {chunk['lines']}")
-            output.append("```diff")
-            output.append(chunk['content'])
-            output.append("```\n")
+        # Stream the diff and format it chunk by chunk
+        diff_command = _git(
+            "--literal-pathspecs", "diff", 
+            f"{base_branch}...{target_branch}",
+            "--no-color", "-U3", "--src-prefix=a/", "--dst-prefix=b/"
+        )
+        if with_stats:
+            diff_command.append("--patch-with-stat")
+        if selected_paths:
+            diff_command.extend(["--", *selected_paths])
+        
+        stats = [] if with_stats else None
+        
+        if output_format == "json":
+            async with asyncio.timeout(30), aclosing(run_git_command_stream(diff_command)) as diff_lines:
+                files = [chunk._asdict() async for chunk in iter_format_diff(
+                    diff_lines, stats=stats, max_lines_per_file=max_lines_per_file
+                )]
+            payload = {'base': base_branch, 'target': target_branch, 'files': files}
+            if with_stats:
+                payload['stats'] = '\n'.join(stats).strip('\n')
+            if selected_paths:
+                payload['omitted_files'] = total_files - max_files
+            return json.dumps(payload, ensure_ascii=False)
+        
+        body = io.StringIO()
+        chunk_count = 0
+        async with asyncio.timeout(30), aclosing(run_git_command_stream(diff_command)) as diff_lines:
+            async for chunk in iter_format_diff(diff_lines, stats=stats, max_lines_per_file=max_lines_per_file):
+                chunk_count += 1
+                body.write(
+                    f"\n📁 File {chunk_count}: {chunk.file}\n"
+                    f"Lines changed: {chunk.lines}\n"
+                    f"```diff\n{chunk.content}\n```\n"
+                )
+        
+        if not chunk_count:
+            return f"✅ No differences found between {base_branch} and {target_branch}"
         
-        return '\n'.join(output)
+        # The summary header depends on the chunk count, so it is added last
+        header = f"📊 Git Diff: {base_branch}...{target_branch}\n"
+        if selected_paths:
+            header += f"Showing the {max_files} most changed of {total_files} files\n"
+        if stats:
+            stats_text = '\n'.join(stats).strip('\n')
+            header += f"\n```\n{stats_text}\n```\n\n"
+        return (
+            f"{header}"
+            f"Found {chunk_count} file(s) with changes:\n"
+            f"{body.getvalue()}"
+        )
         
+    except GitCommandError as e:
+        return f"❌ Git Error: {e}"
+    except TimeoutError:
+        logger.error("Git diff timed out")
+        return "❌ Error: Git diff timed out"
     except Exception as e:
         logger.error(f"Error getting diff: {e}")
         return f"❌ Error: {str(e)}"
 
+# === MCP TOOLS ===
+
+@mcp.tool()
+async def get_branch_diff(base_branch: str = "main", target_branch: str = "HEAD", fetch: bool = True,
+                          max_files: int = 50, max_lines_per_file: int = 2000,
+                          format: Literal["markdown", "json"] = "markdown") -> str:
+    """Get git diff between two branches formatted for PR review. Set fetch=False to skip fetching remotes.
+    
+    Only the max_files most changed files are diffed and each file is cut off after
+    max_lines_per_file changed lines; pass 0 to either limit to disable it.
+    """
+    logger.info(f"Getting diff between {base_branch} and {target_branch}")
+    return await build_branch_diff(base_branch, target_branch, fetch, output_format=format,
+                                   max_files=max_files, max_lines_per_file=max_lines_per_file)
+
+@mcp.tool()
+async def get_branch_diff_with_stats(base_branch: str = "main", target_branch: str = "HEAD", fetch: bool = True,
+                                     max_files: int = 50, max_lines_per_file: int = 2000,
+                                     format: Literal["markdown", "json"] = "markdown") -> str:
+    """Get diff statistics and the full diff between two branches from a single git diff run.
+    
+    Uses the same max_files and max_lines_per_file limits as get_branch_diff; when files
+    are omitted the statistics only cover the files that are shown.
+    """
+    logger.info(f"Getting diff with stats between {base_branch} and {target_branch}")
+    return await build_branch_diff(base_branch, target_branch, fetch, with_stats=True, output_format=format,
+                                   max_files=max_files, max_lines_per_file=max_lines_per_file)
+
 @mcp.tool()
 async def get_diff_stats(base_branch: str = "main", target_branch: str = "HEAD") -> str:
     """Get git diff statistics between two branches."""
@@ -183,16 +426,16 @@ async def get_diff_stats(base_branch: str = "main", target_branch: str = "HEAD")
         target_branch = "HEAD"
     
     # Check if repository exists
-    if not os.path.exists(REPO_PATH):
+    if not _repo_ok():
         return f"❌ Error: Repository not found at {REPO_PATH}. Make sure to mount your git repository."
     
     try:
         # Get diff statistics
-        stats_result = run_git_command([
-            "git", "diff", 
+        stats_result = await run_git_command(_git(
+            "diff", 
             f"{base_branch}...{target_branch}",
             "--stat"
-        ])
+        ))
         
         if not stats_result:
             return "❌ Error: Failed to execute git diff --stat command"
@@ -212,45 +455,60 @@ async def get_diff_stats(base_branch: str = "main", target_branch: str = "HEAD")
         return f"❌ Error: {str(e)}"
 
 @mcp.tool()
-async def get_branch_list() -> str:
+async def get_branch_list(format: Literal["markdown", "json"] = "markdown") -> str:
     """List all available branches in the repository."""
     logger.info("Getting list of branches")
     
     # Check if repository exists
-    if not os.path.exists(REPO_PATH):
+    if not _repo_ok():
         return f"❌ Error: Repository not found at {REPO_PATH}. Make sure to mount your git repository."
     
     try:
-        # Get local branches
-        local_result = run_git_command(["git", "branch"])
-        
-        # Get remote branches
-        remote_result = run_git_command(["git", "branch", "-r"])
-        
-        if not local_result or not remote_result:
+        # List local and remote branches with a single git call
+        refs_result = await run_git_command(_git(
+            "for-each-ref",
+            "--format=%(refname)\t%(HEAD)",
+            "refs/heads", "refs/remotes"
+        ))
+        
+        if not refs_result:
             return "❌ Error: Failed to get branch information"
         
+        if refs_result.returncode != 0:
+            return f"❌ Git Error: {refs_result.stderr.strip()}"
+        
+        local_branches = []
+        remote_branches = []
+        current_branch = None
+        for line in refs_result.stdout.splitlines():
+            refname, _, head_marker = line.partition('\t')
+            if refname.startswith('refs/heads/'):
+                branch = refname[len('refs/heads/'):]
+                local_branches.append(branch)
+                if head_marker == '*':
+                    current_branch = branch
+            elif not refname.endswith('/HEAD'):
+                remote_branches.append(refname[len('refs/remotes/'):])
+        
+        if format == "json":
+            return json.dumps({
+                'local': local_branches,
+                'remote': remote_branches,
+                'current': current_branch
+            }, ensure_ascii=False)
+        
         output = ["🌿 Available Branches:\n"]
         
-        if local_result.returncode == 0 and local_result.stdout.strip():
+        if local_branches:
             output.append("**Local Branches:**")
-            local_branches = []
-            for line in local_result.stdout.strip().split('\n'):
-                branch = line.strip()
-                if branch.startswith('*'):
-                    branch = branch[1:].strip() + " (current)"
-                local_branches.append(f"  - {branch}")
-            output.extend(local_branches)
+            for branch in local_branches:
+                suffix = " (current)" if branch == current_branch else ""
+                output.append(f"  - {branch}{suffix}")
             output.append("")
         
-        if remote_result.returncode == 0 and remote_result.stdout.strip():
+        if remote_branches:
             output.append("**Remote Branches:**")
-            remote_branches = []
-            for line in remote_result.stdout.strip().split('\n'):
-                branch = line.strip()
-                if not branch.endswith('/HEAD'):
-                    remote_branches.append(f"  - {branch}")
-            output.extend(remote_branches)
+            output.extend(f"  - {branch}" for branch in remote_branches)
         
         return '\n'.join(output)
         
@@ -259,7 +517,8 @@ async def get_branch_list() -> str:
         return f"❌ Error: {str(e)}"
 
 @mcp.tool()
-async def get_commit_range(base_branch: str = "main", target_branch: str = "HEAD") -> str:
+async def get_commit_range(base_branch: str = "main", target_branch: str = "HEAD",
+                           format: Literal["markdown", "json"] = "markdown") -> str:
     """Get commit messages between two branches."""
     logger.info(f"Getting commits between {base_branch} and {target_branch}")
     
@@ -270,17 +529,17 @@ async def get_commit_range(base_branch: str = "main", target_branch: str = "HEAD
         target_branch = "HEAD"
     
     # Check if repository exists
-    if not os.path.exists(REPO_PATH):
+    if not _repo_ok():
         return f"❌ Error: Repository not found at {REPO_PATH}. Make sure to mount your git repository."
     
     try:
         # Get commit log
-        log_result = run_git_command([
-            "git", "log", 
+        log_result = await run_git_command(_git(
+            "log", 
             f"{base_branch}..{target_branch}",
             "--oneline",
             "--no-merges"
-        ])
+        ))
         
         if not log_result:
             return "❌ Error: Failed to execute git log command"
@@ -290,6 +549,17 @@ async def get_commit_range(base_branch: str = "main", target_branch: str = "HEAD
         
         commits = log_result.stdout.strip()
         
+        if format == "json":
+            commit_list = []
+            for commit in commits.split('\n') if commits else []:
+                commit_hash, _, subject = commit.partition(' ')
+                commit_list.append({'hash': commit_hash, 'subject': subject})
+            return json.dumps({
+                'base': base_branch,
+                'target': target_branch,
+                'commits': commit_list
+            }, ensure_ascii=False)
+        
         if not commits:
             return f"✅ No new commits found between {base_branch} and {target_branch}"
         
@@ -310,9 +580,13 @@ async def get_commit_range(base_branch: str = "main", target_branch: str = "HEAD
 if __name__ == "__main__":
     logger.info("Starting Git Diff MCP server...")
     
-    # Check if repository path exists
-    if not os.path.exists(REPO_PATH):
-        logger.warning(f"Repository path {REPO_PATH} does not exist. Make sure to mount your git repository.")
+    # Check if repository path is a git repository
+    if not _repo_ok():
+        logger.warning(f"Repository path {REPO_PATH} is not a git repository. Make sure to mount your git repository.")
+    
+    # Allow a late-mounted repository to be picked up without a restart
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: _repo_ok.cache_clear())
     
     try:
         mcp.run(transport='stdio')